@@ -1,11 +1,23 @@
 import os
+import pickle
 import warnings
 import joblib
 import numpy as np
 import pandas as pd
-from typing import Union, List
+from typing import Union, List, Tuple
+from sklearn.base import clone
 from sklearn.ensemble import RandomForestRegressor
-from skforecast.ForecasterAutoregMultiSeries import ForecasterAutoregMultiSeries
+from skforecast.ForecasterAutoregMultiSeries import (
+    ForecasterAutoregMultiSeries as BaseForecasterAutoregMultiSeries,
+)
+from skforecast.utils import (
+    check_exog_dtypes,
+    check_predict_input,
+    expand_index,
+    preprocess_last_window,
+    transform_dataframe,
+    transform_series,
+)
 
 from schema.data_schema import ForecastingSchema
 from sklearn.exceptions import NotFittedError
@@ -13,13 +25,177 @@ from sklearn.preprocessing import MinMaxScaler
 
 from logger import get_logger
 
-warnings.filterwarnings("ignore")
-
 logger = get_logger(task_name="model")
 PREDICTOR_FILE_NAME = "predictor.joblib"
 
 PREDICTOR_FILE_NAME = "predictor.joblib"
 
+try:
+    import lz4  # noqa: F401
+
+    PREDICTOR_COMPRESSION = ("lz4", 3)
+except ImportError:
+    PREDICTOR_COMPRESSION = ("zlib", 3)
+
+
+class ForecasterAutoregMultiSeries(BaseForecasterAutoregMultiSeries):
+    """skforecast's ForecasterAutoregMultiSeries, building its lag matrices with
+    NumPy strided views and forecasting all series together in a single
+    recursion instead of one series at a time.
+
+    The class keeps the upstream name because skforecast validates inputs
+    based on the forecaster's class name.
+    """
+
+    def _create_lags(
+        self, y: np.ndarray, series_name: str
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Transforms a series into its lag matrix and target values.
+
+        Row i of the lag matrix holds the values preceding the i-th target,
+        with lag 1 in the first column, lag 2 in the second and so on.
+
+        Args:
+            y (np.ndarray): 1d array of the training series.
+            series_name (str): Name of the series.
+
+        Returns (Tuple[np.ndarray, np.ndarray]): The lag matrix and the target values.
+        """
+        n_splits = len(y) - self.max_lag
+        if n_splits <= 0:
+            raise ValueError(
+                f"The maximum lag ({self.max_lag}) must be less than the length of the series '{series_name}', ({len(y)})."
+            )
+
+        # windows[i] = y[i : i + max_lag], so lag l of target y[i + max_lag]
+        # sits at position max_lag - l of the window. Lags are kept in float32,
+        # the precision the trees split on.
+        windows = np.lib.stride_tricks.sliding_window_view(
+            y[:-1].astype(np.float32), self.max_lag
+        )
+        X_data = windows[:, self.max_lag - self.lags]
+        y_data = y[self.max_lag :]
+
+        return X_data, y_data
+
+    def predict(
+        self,
+        steps: int,
+        levels: Union[str, List[str]] = None,
+        last_window: pd.DataFrame = None,
+        exog: Union[pd.Series, pd.DataFrame] = None,
+    ) -> pd.DataFrame:
+        """
+        Predict n steps ahead for the given levels.
+
+        At every step of the recursion the regressor is called once on a matrix
+        holding one row per level, rather than once per level.
+
+        Args:
+            steps (int): Number of future steps predicted.
+            levels (Union[str, List[str]]): Time series to be predicted.
+                If None, all series seen in training are predicted.
+            last_window (pd.DataFrame): Values used to create the lags of the first step.
+                If None, the last window of the training data is used.
+            exog (Union[pd.Series, pd.DataFrame]): Exogenous variables for the forecast horizon.
+
+        Returns (pd.DataFrame): Predicted values, one column for each level.
+        """
+        if levels is None:
+            levels = self.series_col_names
+        elif isinstance(levels, str):
+            levels = [levels]
+
+        if last_window is None:
+            last_window = self.last_window
+
+        check_predict_input(
+            forecaster_name=type(self).__name__,
+            steps=steps,
+            fitted=self.fitted,
+            included_exog=self.included_exog,
+            index_type=self.index_type,
+            index_freq=self.index_freq,
+            window_size=self.window_size,
+            last_window=last_window,
+            last_window_exog=None,
+            exog=exog,
+            exog_type=self.exog_type,
+            exog_col_names=self.exog_col_names,
+            interval=None,
+            alpha=None,
+            max_steps=None,
+            levels=levels,
+            series_col_names=self.series_col_names,
+        )
+
+        last_window = last_window.iloc[-self.window_size :]
+        _, last_window_index = preprocess_last_window(last_window=last_window)
+        prediction_index = expand_index(index=last_window_index, steps=steps)
+
+        # Feature matrix with one row per level, columns laid out as in training
+        X = np.zeros((len(levels), len(self.X_train_col_names)), dtype=np.float32)
+        X[
+            np.arange(len(levels)),
+            [self.X_train_col_names.index(level) for level in levels],
+        ] = 1.0
+
+        exog_values = None
+        if exog is not None:
+            if isinstance(exog, pd.DataFrame):
+                exog = transform_dataframe(
+                    df=exog,
+                    transformer=self.transformer_exog,
+                    fit=False,
+                    inverse_transform=False,
+                )
+            else:
+                exog = transform_series(
+                    series=exog,
+                    transformer=self.transformer_exog,
+                    fit=False,
+                    inverse_transform=False,
+                )
+                exog = exog.to_frame()
+            check_exog_dtypes(exog=exog)
+            exog_values = exog.to_numpy()[:steps]
+            exog_cols = [self.X_train_col_names.index(col) for col in exog.columns]
+
+        # Transformed last window of every level followed by its predictions
+        values = np.empty((len(levels), self.window_size + steps))
+        for i, level in enumerate(levels):
+            values[i, : self.window_size] = transform_series(
+                series=last_window[level],
+                transformer=self.transformer_series_[level],
+                fit=False,
+                inverse_transform=False,
+            ).to_numpy()
+
+        lag_cols = np.arange(len(self.lags))
+        with warnings.catch_warnings():
+            # The regressor was fitted with feature names, X has none
+            warnings.simplefilter("ignore")
+            for step in range(steps):
+                position = self.window_size + step
+                X[:, lag_cols] = values[:, position - self.lags]
+                if exog_values is not None:
+                    X[:, exog_cols] = exog_values[step]
+                values[:, position] = self.regressor.predict(X)
+
+        predictions = np.empty((steps, len(levels)))
+        for i, level in enumerate(levels):
+            predictions[:, i] = transform_series(
+                series=pd.Series(
+                    values[i, self.window_size :], index=prediction_index, name=level
+                ),
+                transformer=self.transformer_series_[level],
+                fit=False,
+                inverse_transform=True,
+            ).to_numpy()
+
+        return pd.DataFrame(predictions, index=prediction_index, columns=levels)
+
 
 class Forecaster:
     """A wrapper class for the RandomForest Forecaster.
@@ -39,9 +215,13 @@ class Forecaster:
         criterion: str = "squared_error",
         min_samples_split: Union[int, float] = 2,
         min_samples_leaf: int = 1,
+        max_depth: int = None,
+        max_features: Union[str, int, float] = 1.0,
+        max_samples: Union[int, float] = None,
         lags: Union[int, List[int]] = 7,
         use_exogenous: bool = True,
         random_state: int = 0,
+        n_jobs: int = -1,
         **kwargs,
     ):
         """Construct a new RandomForest Forecaster
@@ -78,6 +258,19 @@ class Forecaster:
                 If int, then consider min_samples_leaf as the minimum number.
                 If float, then min_samples_leaf is a fraction and ceil(min_samples_leaf * n_samples) are the minimum number of samples for each node.
 
+            max_depth (int): The maximum depth of the tree. If None, then nodes are expanded until all leaves are pure
+                or until all leaves contain less than min_samples_split samples.
+
+            max_features (Union[str, int, float]): The number of features to consider when looking for the best split.
+                If “sqrt”, then max_features=sqrt(n_features). If “log2”, then max_features=log2(n_features).
+                If int, then consider max_features features at each split.
+                If float, then max_features is a fraction and max(1, int(max_features * n_features_in_)) features are considered at each split.
+
+            max_samples (Union[int, float]): The number of samples to draw from the training data to train each tree.
+                If None, then draw n_samples samples. If int, then draw max_samples samples.
+                If float, then draw max(round(n_samples * max_samples), 1) samples.
+                Only used when bootstrap is enabled.
+
             lags (Union[int, List[int]]): Lags used as predictors. Index starts at 1, so lag 1 is equal to t-1.
                 - int: include lags from 1 to lags (included).
                 - list, 1d numpy ndarray or range: include only lags present in lags, all elements must be int.
@@ -87,13 +280,20 @@ class Forecaster:
 
             random_state (int): Sets the underlying random seed at model initialization time.
 
+            n_jobs (int): The number of jobs to run in parallel when building the trees.
+                -1 means using all processors.
+
             kwargs (dict): Additional parameters accepted by the sklearn base model.
         """
         self.n_estimators = n_estimators
         self.criterion = criterion
         self.min_samples_split = min_samples_split
         self.min_samples_leaf = min_samples_leaf
+        self.max_depth = max_depth
+        self.max_features = max_features
+        self.max_samples = max_samples
         self.random_state = random_state
+        self.n_jobs = n_jobs
         self.lags = lags
         self.use_exogenous = use_exogenous
         self._is_trained = False
@@ -108,18 +308,23 @@ class Forecaster:
         self.use_exogenous = use_exogenous and has_covariates
 
         if history_forecast_ratio:
-            self.history_length = (
+            self.history_length = int(
                 self.data_schema.forecast_length * history_forecast_ratio
             )
         if lags_forecast_ratio:
-            lags = self.data_schema.forecast_length * lags_forecast_ratio
+            lags = int(self.data_schema.forecast_length * lags_forecast_ratio)
             self.lags = lags
 
         self.base_model = RandomForestRegressor(
             n_estimators=self.n_estimators,
             min_samples_leaf=self.min_samples_leaf,
+            max_depth=self.max_depth,
+            max_features=self.max_features,
+            # sklearn rejects max_samples when trees are not bootstrapped
+            max_samples=self.max_samples if kwargs.get("bootstrap", True) else None,
             min_samples_split=self.min_samples_split,
             random_state=self.random_state,
+            n_jobs=self.n_jobs,
             **kwargs,
         )
 
@@ -161,31 +366,14 @@ class Forecaster:
 
         return history
 
-    def crop_data(self, all_series: List[pd.DataFrame]) -> List[pd.DataFrame]:
-        """
-        Reduces the data based on the history_length attribute.
-
-        Args:
-            all_series (List[pd.DataFrame]): List of the original data to be reduced.
-
-        Returns (List[pd.DataFrame]): List of the reduced data.
-
-        """
-
-        new_length = []
-        for series in all_series:
-            series = series.iloc[-self.history_length :]
-            new_length.append(series.copy())
-        all_series = new_length
-        return all_series
-
     def _validate_lags_and_history_length(self, series_length: int):
         """
         Validate the value of lags and that history length is at least double the forecast horizon.
         If the provided lags value is invalid (too large), lags are set to the largest possible value.
+        When lags is a list, 1d array or range, only the lags shorter than the series are kept.
 
         Args:
-            series_length (int): The length of the history.
+            series_length (int): The length of the shortest series in the history.
 
         Returns: None
         """
@@ -194,11 +382,26 @@ class Forecaster:
                 f"Training series is too short. History should be at least double the forecast horizon. history_length = ({series_length}), forecast horizon = ({self.data_schema.forecast_length})"
             )
 
-        if self.lags >= series_length:
+        is_lags_sequence = np.ndim(self.lags) > 0
+        if is_lags_sequence:
+            all_lags = np.atleast_1d(np.asarray(self.lags, dtype=int))
+            max_lag = int(all_lags.max())
+        else:
+            max_lag = self.lags
+
+        if max_lag >= series_length:
+            if is_lags_sequence:
+                lags = [int(lag) for lag in all_lags if lag < series_length]
+                if not lags:
+                    raise ValueError(
+                        f"None of the provided lags ({all_lags.tolist()}) is less than the length of the series ({series_length})."
+                    )
+            else:
+                lags = series_length - 1
             logger.warning(
-                f"The maximum lag ({self.lags}) must be less than the length of the series ({series_length}). Lags set to ({series_length - 1})"
+                f"The maximum lag ({max_lag}) must be less than the length of the series ({series_length}). Lags set to ({lags})"
             )
-            self.lags = series_length - 1
+            self.lags = lags
 
     def fit(
         self,
@@ -216,42 +419,73 @@ class Forecaster:
         history = self._add_future_covariates_from_date(
             history=history, data_schema=data_schema, is_training=True
         )
-        groups_by_ids = history.groupby(data_schema.id_col)
-        all_ids = list(groups_by_ids.groups.keys())
-        all_series = [
-            groups_by_ids.get_group(id_).drop(columns=data_schema.id_col).reset_index()
-            for id_ in all_ids
-        ]
-
-        if self.history_length:
-            all_series = self.crop_data(all_series)
+        id_col = data_schema.id_col
+        target = data_schema.target
+        covariates_names = data_schema.future_covariates + data_schema.static_covariates
+
+        # Single pass over the groups, keeping only the cropped target and
+        # covariate values of each series rather than whole sub-frames
+        all_ids, targets, covariates = [], [], []
+        first_length = None
+        for id_, series in history.groupby(id_col, sort=False):
+            if first_length is None:
+                first_length = len(series)
+            if self.history_length:
+                series = series.iloc[-self.history_length :]
+            all_ids.append(id_)
+            targets.append(series[target].to_numpy())
+            if self.use_exogenous:
+                covariates.append(series[covariates_names].to_numpy(dtype=np.float32))
+
+        # Series are stacked side by side on a common timeline, and the exogenous
+        # covariates cannot carry padding, so all series must have the same length
+        retained_lengths = {len(values) for values in targets}
+        if len(retained_lengths) > 1:
+            raise ValueError(
+                f"All training series must have the same length. Found lengths {sorted(retained_lengths)}."
+            )
 
-        targets = [series[data_schema.target] for series in all_series]
-        target_series = pd.DataFrame({f"id_{k}": v for k, v in zip(all_ids, targets)})
+        # Validate against the shortest series before any training matrices are built
+        self._validate_lags_and_history_length(
+            series_length=min(len(values) for values in targets)
+        )
 
-        self._validate_lags_and_history_length(series_length=len(targets[0]))
+        # Positions of the retained samples within the first series
+        index = pd.RangeIndex(start=first_length - len(targets[0]), stop=first_length)
+        target_series = pd.DataFrame(
+            {f"id_{k}": v for k, v in zip(all_ids, targets)}, index=index
+        )
 
         exog = None
 
         if self.use_exogenous:
-            covariates_names = (
-                data_schema.future_covariates + data_schema.static_covariates
+            exog = np.hstack(covariates)
+            exog = pd.DataFrame(
+                exog, index=index, columns=[str(i) for i in range(exog.shape[1])]
             )
-            exog = [series[covariates_names] for series in all_series]
-            exog = pd.concat(exog, axis=1)
-            exog.columns = [str(i) for i in range(exog.shape[1])]
-            self.train_end_index = all_series[0].index.values[-1]
+            self.train_end_index = index[-1]
 
         self.model = ForecasterAutoregMultiSeries(
-            regressor=self.base_model,
+            # skforecast keeps the regressor it is given; fit a copy so that
+            # prediction-time settings do not leak back into base_model
+            regressor=clone(self.base_model),
             lags=self.lags,
             transformer_series=MinMaxScaler(),
             transformer_exog=self.transformer_exog,
         )
 
-        self.model.fit(series=target_series, exog=exog)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            # In-sample residuals only serve prediction intervals, which are not used
+            self.model.fit(
+                series=target_series, exog=exog, store_in_sample_residuals=False
+            )
+        # Recursive prediction calls the regressor on a handful of rows per step,
+        # where dispatching trees to a thread pool costs more than it saves.
+        self.model.regressor.set_params(n_jobs=1)
 
         self.all_ids = all_ids
+        self._id_to_idx = {id_: i for i, id_ in enumerate(all_ids)}
         self._is_trained = True
 
     def predict(self, test_data: pd.DataFrame, prediction_col_name: str) -> np.ndarray:
@@ -266,36 +500,44 @@ class Forecaster:
         if not self._is_trained:
             raise NotFittedError("Model is not fitted yet.")
 
+        data_schema = self.data_schema
+        id_col = data_schema.id_col
+        forecast_length = data_schema.forecast_length
         test_data = self._add_future_covariates_from_date(
-            history=test_data, data_schema=self.data_schema, is_training=False
+            history=test_data, data_schema=data_schema, is_training=False
         )
 
-        groups_by_ids = test_data.groupby(self.data_schema.id_col)
-        all_series = [
-            groups_by_ids.get_group(id_)
-            .drop(columns=self.data_schema.id_col)
-            .reset_index()
-            for id_ in self.all_ids
-        ]
+        groups_by_ids = test_data.groupby(id_col, sort=False)
+        grouped = dict(iter(groups_by_ids))
+        all_series = [grouped[id_] for id_ in self.all_ids]
         exog = None
         if self.use_exogenous:
             covariates_names = (
-                self.data_schema.future_covariates + self.data_schema.static_covariates
+                data_schema.future_covariates + data_schema.static_covariates
+            )
+            # Series are stacked side by side by position, no index alignment needed
+            exog = np.hstack(
+                [
+                    series[covariates_names].to_numpy(dtype=np.float32)
+                    for series in all_series
+                ]
             )
-            exog = [series[covariates_names] for series in all_series]
-            exog = pd.concat(exog, axis=1)
-            exog.columns = [str(i) for i in range(exog.shape[1])]
             start = self.train_end_index + 1
-            exog.index = pd.RangeIndex(
-                start=start,
-                stop=start + self.data_schema.forecast_length,
+            exog = pd.DataFrame(
+                exog,
+                index=pd.RangeIndex(start=start, stop=start + forecast_length),
+                columns=[str(i) for i in range(exog.shape[1])],
             )
 
-        forecast = self.model.predict(steps=self.data_schema.forecast_length, exog=exog)
-        forecast.columns = [c.split("id_")[1] for c in forecast.columns]
-        predictions = []
-        for column in forecast.columns:
-            predictions += forecast[column].values.tolist()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            forecast = self.model.predict(steps=forecast_length, exog=exog)
+        # Forecast columns follow self.all_ids; scatter each one to the row
+        # positions of its id so the rows of an id need not be contiguous
+        forecast = forecast.to_numpy()
+        predictions = np.empty(len(test_data))
+        for id_, positions in groups_by_ids.indices.items():
+            predictions[positions] = forecast[: len(positions), self._id_to_idx[id_]]
 
         test_data[prediction_col_name] = predictions
 
@@ -309,7 +551,12 @@ class Forecaster:
         """
         if not self._is_trained:
             raise NotFittedError("Model is not fitted yet.")
-        joblib.dump(self, os.path.join(model_dir_path, PREDICTOR_FILE_NAME))
+        joblib.dump(
+            self,
+            os.path.join(model_dir_path, PREDICTOR_FILE_NAME),
+            compress=PREDICTOR_COMPRESSION,
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
 
     @classmethod
     def load(cls, model_dir_path: str) -> "Forecaster":